@@ -2,7 +2,7 @@
 Chinese Remainder Theorem (CRT) batching.
 """
 
-from util.ntt import NTTContext
+from util.ntt import get_ntt_context
 from util.plaintext import Plaintext
 from util.polynomial import Polynomial
 
@@ -34,7 +34,7 @@ class BatchEncoder:
         """
         self.degree = params.poly_degree
         self.plain_modulus = params.plain_modulus
-        self.ntt = NTTContext(params.poly_degree, params.plain_modulus)  
+        self.ntt = get_ntt_context(params.poly_degree, params.plain_modulus)
 
     def encode(self, values):
         """Encodes a list of integers into a polynomial.
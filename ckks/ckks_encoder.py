@@ -1,7 +1,7 @@
 """A module to encode integers as specified in the CKKS scheme.
 """
 
-from util.ntt import FFTContext
+from util.ntt import get_fft_context
 from util.plaintext import Plaintext
 from util.polynomial import Polynomial
 
@@ -21,7 +21,7 @@ class CKKSEncoder:
                 plaintext modulus, and ciphertext modulus.
         """
         self.degree = params.poly_degree
-        self.fft = FFTContext(self.degree * 2)
+        self.fft = get_fft_context(self.degree * 2)
 
     def encode(self, values, scaling_factor):
         """Encodes complex numbers into a polynomial.
@@ -7,6 +7,7 @@ setup(
     author_email='erabelli@mit.edu',
     license='MIT',
     install_requires=[
+        'numpy',
         'sympy',
         'pytest',
     ],
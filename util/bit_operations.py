@@ -1,6 +1,5 @@
 """A module to perform bit operations.
 """
-from math import log
 
 def reverse_bits(value, width):
     """Reverses bits of an integer.
@@ -34,6 +33,7 @@ def bit_reverse_vec(values):
         The reversed list based on indices.
     """
     result = [0] * len(values)
+    width = len(values).bit_length() - 1
     for i in range(len(values)):
-        result[i] = values[reverse_bits(i, int(log(len(values), 2)))]
+        result[i] = values[reverse_bits(i, width)]
     return result
\ No newline at end of file
@@ -2,7 +2,7 @@
 """
 
 import util.number_theory as nbtheory
-from util.ntt import NTTContext
+from util.ntt import get_ntt_context
 
 class CRTContext:
 
@@ -55,7 +55,7 @@ class CRTContext:
         """
         self.ntts = []
         for prime in self.primes:
-            ntt = NTTContext(self.poly_degree, prime)
+            ntt = get_ntt_context(self.poly_degree, prime)
             self.ntts.append(ntt)
 
     def precompute_crt(self):
@@ -2,9 +2,177 @@
 and Fermat Theoretic Transform (FTT). See https://rijndael.ece.vt.edu/schaum/pdf/papers/2013hostb.pdf.
 """
 
-from math import log, pi, cos, sin
+from functools import cached_property, lru_cache
+import numpy as np
 import util.number_theory as nbtheory
-from util.bit_operations import bit_reverse_vec, reverse_bits
+from util.bit_operations import bit_reverse_vec
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import cupy
+except ImportError:
+    cupy = None
+
+# One NTT stage over a batch of rows, one thread per butterfly. The butterfly
+# is the same Harvey form as the CPU kernels, with __umul64hi supplying the
+# high half of the 128-bit product.
+_NTT_STAGE_CUDA_SRC = r'''
+extern "C" __global__
+void ntt_stage(unsigned long long *data,
+               const unsigned long long *rou,
+               const unsigned long long *rou_precon,
+               const unsigned long long q,
+               const long long num_butterflies,
+               const int logm,
+               const int log_num_coeffs)
+{
+    const long long tid = (long long)blockDim.x * blockIdx.x + threadIdx.x;
+    if (tid >= num_butterflies) {
+        return;
+    }
+
+    const long long half = 1LL << (logm - 1);
+    const long long num_coeffs = 1LL << log_num_coeffs;
+    const long long row = tid / (num_coeffs >> 1);
+    const long long k = tid % (num_coeffs >> 1);
+    const long long i = k & (half - 1);
+    const long long j = (k >> (logm - 1)) << logm;
+    const long long index_even = row * num_coeffs + j + i;
+    const long long index_odd = index_even + half;
+
+    const long long rou_idx = i << (log_num_coeffs - logm);
+    const unsigned long long odd_val = data[index_odd];
+
+    const unsigned long long quotient = __umul64hi(rou_precon[rou_idx], odd_val);
+    unsigned long long omega_factor = rou[rou_idx] * odd_val - quotient * q;
+    if (omega_factor >= q) {
+        omega_factor -= q;
+    }
+
+    const unsigned long long even_val = data[index_even];
+    unsigned long long butterfly_plus = even_val + omega_factor;
+    if (butterfly_plus >= q) {
+        butterfly_plus -= q;
+    }
+    unsigned long long butterfly_minus = even_val + q - omega_factor;
+    if (butterfly_minus >= q) {
+        butterfly_minus -= q;
+    }
+
+    data[index_even] = butterfly_plus;
+    data[index_odd] = butterfly_minus;
+}
+'''
+
+if numba is not None:
+    @numba.njit("uint64(uint64, uint64)", cache=True)
+    def _mul_hi_u64(a, b):
+        """Returns the high 64 bits of the 128-bit product a * b.
+
+        Computed portably from 32-bit halves; LLVM lowers this to the
+        machine's widening multiply.
+        """
+        a_lo = a & np.uint64(0xFFFFFFFF)
+        a_hi = a >> np.uint64(32)
+        b_lo = b & np.uint64(0xFFFFFFFF)
+        b_hi = b >> np.uint64(32)
+
+        carry = (a_lo * b_lo) >> np.uint64(32)
+        mid = a_hi * b_lo + carry
+        mid_lo = (mid & np.uint64(0xFFFFFFFF)) + a_lo * b_hi
+        return a_hi * b_hi + (mid >> np.uint64(32)) + (mid_lo >> np.uint64(32))
+
+    @numba.njit("uint64[:](uint64[:], uint64[:], uint64[:], uint64, int64)",
+                cache=True, parallel=True)
+    def _ntt_u64(result, rou, rou_precon, q, log_num_coeffs):
+        """Runs the iterated NTT butterflies in place on uint64 coefficients.
+
+        Compiled with Numba when it is available. Each butterfly multiply uses
+        the Harvey form with the Shoup preconditioned twiddles, so the kernel
+        is valid for any modulus q < 2^62.
+
+        Args:
+            result (ndarray): Bit-reversed uint64 coefficients, reduced mod q.
+            rou (ndarray): The d/2 distinct butterfly twiddles, i.e. powers of
+                the squared root of unity, as uint64.
+            rou_precon (ndarray): Preconditioned powers floor(w * 2^64 / q).
+            q (uint64): Modulus for coefficients of the polynomial.
+            log_num_coeffs (int): Log of the number of coefficients.
+
+        Returns:
+            The transformed coefficients, in the same buffer as the input.
+        """
+        num_coeffs = result.shape[0]
+        for logm in range(1, log_num_coeffs + 1):
+            # Stage-invariant values, hoisted out of the butterfly loops.
+            half = 1 << (logm - 1)
+            num_blocks = num_coeffs >> logm
+            rou_shift = log_num_coeffs - logm
+
+            # Butterflies at the same stage are all independent, so either
+            # loop may run in parallel; parallelize whichever dimension is
+            # wider. With the twiddle index i outermost, each twiddle is
+            # loaded once and reused across every block of the stage.
+            if num_blocks >= half:
+                for block in numba.prange(num_blocks):
+                    j = block << logm
+                    for i in range(half):
+                        index_even = j + i
+                        index_odd = index_even + half
+
+                        rou_idx = i << rou_shift
+                        even_val = result[index_even]
+                        odd_val = result[index_odd]
+
+                        # Harvey butterfly: the products wrap mod 2^64, but
+                        # the difference equals the true value in [0, 2q).
+                        quotient = _mul_hi_u64(rou_precon[rou_idx], odd_val)
+                        omega_factor = rou[rou_idx] * odd_val - quotient * q
+                        if omega_factor >= q:
+                            omega_factor -= q
+
+                        # Both operands are reduced, so the sums lie in
+                        # [0, 2q) and a conditional subtract replaces the
+                        # modulo.
+                        butterfly_plus = even_val + omega_factor
+                        if butterfly_plus >= q:
+                            butterfly_plus -= q
+                        butterfly_minus = even_val + q - omega_factor
+                        if butterfly_minus >= q:
+                            butterfly_minus -= q
+
+                        result[index_even] = butterfly_plus
+                        result[index_odd] = butterfly_minus
+            else:
+                for i in numba.prange(half):
+                    rou_val = rou[i << rou_shift]
+                    rou_precon_val = rou_precon[i << rou_shift]
+                    for block in range(num_blocks):
+                        index_even = (block << logm) + i
+                        index_odd = index_even + half
+
+                        even_val = result[index_even]
+                        odd_val = result[index_odd]
+
+                        quotient = _mul_hi_u64(rou_precon_val, odd_val)
+                        omega_factor = rou_val * odd_val - quotient * q
+                        if omega_factor >= q:
+                            omega_factor -= q
+
+                        butterfly_plus = even_val + omega_factor
+                        if butterfly_plus >= q:
+                            butterfly_plus -= q
+                        butterfly_minus = even_val + q - omega_factor
+                        if butterfly_minus >= q:
+                            butterfly_minus -= q
+
+                        result[index_even] = butterfly_plus
+                        result[index_odd] = butterfly_minus
+        return result
 
 class NTTContext:
     """An instance of Number/Fermat Theoretic Transform parameters.
@@ -17,14 +185,27 @@ class NTTContext:
     Attributes:
         coeff_modulus (int): Modulus for coefficients of the polynomial.
         degree (int): Degree of the polynomial ring.
-        roots_of_unity (list): The ith member of the list is w^i, where w
+        roots_of_unity (ndarray): The ith member of the array is w^i, where w
             is a root of unity.
-        roots_of_unity_inv (list): The ith member of the list is w^(-i),
-            where w is a root of unity.
-        scaled_rou_inv (list): The ith member of the list is 1/n * w^(-i),
+        roots_of_unity_inv (ndarray): The ith member of the array is w^(-i),
+            where w is a root of unity. Built lazily on the first inverse
+            transform, along with the other inverse tables below.
+        scaled_rou_inv (ndarray): The ith member of the array is 1/d * w^(-i),
             where w is a root of unity.
-        reversed_bits (list): The ith member of the list is the bits of i
-            reversed, used in the iterative implementation of NTT.
+        stage_twiddles (list): The (logm - 1)th member of the list is an array
+            of exactly the twiddles consumed by stage logm of the NTT, in
+            consumption order, as a strided view into the contiguous table of
+            the d/2 distinct butterfly twiddles.
+        stage_twiddles_inv (list): Same as stage_twiddles, for the powers of
+            the inverse root of unity.
+        stage_twiddles_precon (list): Per-stage Shoup preconditioned twiddles,
+            floor(w * 2^64 / q), used by the Harvey butterfly on the
+            arbitrary-precision path. None when the modulus does not permit it.
+        stage_twiddles_inv_precon (list): Same as stage_twiddles_precon, for
+            the powers of the inverse root of unity.
+        reversed_bits (ndarray): The ith member of the np.intp array is the
+            bits of i reversed, used as a fancy-index gather in the iterative
+            implementation of NTT.
     """
 
     def __init__(self, poly_degree, coeff_modulus, root_of_unity=None):
@@ -60,26 +241,177 @@ class NTTContext:
             root_of_unity (int): Root of unity to perform the NTT with.
         """
 
-        # Find powers of root of unity.
-        self.roots_of_unity = [1] * self.degree
+        # We store the twiddle tables as NumPy arrays so the transform can run
+        # its butterflies as whole-array operations. The uint64 fast path
+        # requires that a product of two residues fits in 64 bits, so we fall
+        # back to object dtype (arbitrary-precision ints) for larger moduli.
+        if self.coeff_modulus < (1 << 32):
+            twiddle_dtype = np.uint64
+        else:
+            twiddle_dtype = object
+        self._twiddle_dtype = twiddle_dtype
+
+        # Find powers of root of unity. The inverse tables are built lazily in
+        # cached properties on first inverse transform, so forward-only
+        # contexts (e.g. evaluation-side keys) skip those O(d) passes.
+        self.root_of_unity = root_of_unity
+        roots_of_unity = [1] * self.degree
         for i in range(1, self.degree):
-            self.roots_of_unity[i] = \
-                (self.roots_of_unity[i - 1] * root_of_unity) % self.coeff_modulus
-
-        # Find powers of inverse root of unity.
-        root_of_unity_inv = nbtheory.mod_inv(root_of_unity, self.coeff_modulus)
-        self.roots_of_unity_inv = [1] * self.degree
+            roots_of_unity[i] = \
+                (roots_of_unity[i - 1] * root_of_unity) % self.coeff_modulus
+        self.roots_of_unity = np.asarray(roots_of_unity, dtype=twiddle_dtype)
+
+        # The butterfly stages only ever consume even powers of w: stage logm
+        # reads w^(i * 2^(1 + log_d - logm)) with i < 2^(logm - 1), so the
+        # exponent is even and stays below d. Those are the powers of w^2, of
+        # which only d/2 are distinct. We store that half-size table once,
+        # contiguously, and each stage's twiddles are a strided view into it,
+        # so the resident butterfly twiddles are d/2 entries per direction
+        # instead of per-stage copies. The full tables above are still needed
+        # for the FTT pointwise scales, which use odd powers too.
+        omega_powers = np.ascontiguousarray(self.roots_of_unity[0::2])
+        log_degree = self.degree.bit_length() - 1
+        self.stage_twiddles = []
+        for logm in range(1, log_degree + 1):
+            stride = 1 << (log_degree - logm)
+            self.stage_twiddles.append(omega_powers[::stride])
+
+        # Shoup-style preconditioned twiddles, floor(w * 2^64 / q), for the
+        # arbitrary-precision path. The Harvey butterfly computes
+        # Q = (w' * y) >> 64 and t = w * y - Q * q, which leaves t in [0, 2q)
+        # with one conditional subtract instead of a full big-int modulo.
+        # The derivation requires q < 2^62; larger moduli keep the plain
+        # modulo, and the uint64 path never consults these tables.
+        #
+        # Montgomery form (w * 2^64 mod q with REDC) is the other standard way
+        # to make this multiply division-free, but it only pays off when both
+        # operands vary: it would force every transform to map coefficients
+        # into and out of the 2^64-residue domain. Since each butterfly
+        # multiplies by a constant twiddle, the Shoup form gives the same
+        # reduction with the twiddles kept in standard residue form, so we
+        # deliberately stay with it.
+        self.stage_twiddles_precon = None
+        if twiddle_dtype is object and self.coeff_modulus < (1 << 62):
+            omega_precon = \
+                (omega_powers * (1 << 64)) // self.coeff_modulus
+            self.stage_twiddles_precon = \
+                [omega_precon[::1 << (log_degree - logm)]
+                 for logm in range(1, log_degree + 1)]
+
+        # uint64 copies of the d/2 distinct butterfly twiddles and their
+        # preconditioned forms for the compiled Harvey kernel, which is valid
+        # for any q < 2^62. These are kept separate from the public tables,
+        # which stay in object dtype for moduli past the plain-multiply bound.
+        self._rou_u64 = None
+        self._rou_precon_u64 = None
+        if numba is not None and self.coeff_modulus < (1 << 62):
+            q = self.coeff_modulus
+            omega_u64 = roots_of_unity[0::2]
+            self._rou_u64 = np.asarray(omega_u64, dtype=np.uint64)
+            self._rou_precon_u64 = np.asarray(
+                [(w << 64) // q for w in omega_u64], dtype=np.uint64)
+
+        # Device copies of the butterfly twiddles for ntt_batched_cuda, built
+        # lazily on first use.
+        self._cuda_twiddle_cache = {}
+
+        # Compute precomputed array of reversed bits for iterated NTT. The
+        # array is kept as np.intp so the bit-reversal permutation is a single
+        # fancy-index gather.
+        width = self.degree.bit_length() - 1
+        indices = np.arange(self.degree, dtype=np.uint32)
+        reversed_bits = np.zeros_like(indices)
+        for bit in range(width):
+            reversed_bits |= ((indices >> bit) & 1) << (width - 1 - bit)
+        self.reversed_bits = reversed_bits.astype(np.intp)
+
+        # Bit-reversed copy of the forward roots for ftt_fwd's fused
+        # pre-scale, gathered once here instead of once per transform.
+        self._rou_reversed = self.roots_of_unity[self.reversed_bits]
+
+    @cached_property
+    def roots_of_unity_inv(self):
+        """Builds the powers of the inverse root of unity on first use.
+
+        A context used only for forward transforms never pays for the inverse
+        tables; this property (and the ones derived from it) run their O(d)
+        passes the first time an inverse transform needs them.
+        """
+        root_of_unity_inv = \
+            nbtheory.mod_inv(self.root_of_unity, self.coeff_modulus)
+        roots_of_unity_inv = [1] * self.degree
         for i in range(1, self.degree):
-            self.roots_of_unity_inv[i] = \
-                (self.roots_of_unity_inv[i - 1] * root_of_unity_inv) % self.coeff_modulus
+            roots_of_unity_inv[i] = \
+                (roots_of_unity_inv[i - 1] * root_of_unity_inv) % self.coeff_modulus
+        return np.asarray(roots_of_unity_inv, dtype=self._twiddle_dtype)
+
+    @cached_property
+    def scaled_rou_inv(self):
+        """Builds the inverse powers scaled by 1/d on first use, so ftt_inv's
+        final pass is a single vector multiply."""
+        poly_degree_inv = nbtheory.mod_inv(self.degree, self.coeff_modulus)
+        scaled_rou_inv = [(int(r) * poly_degree_inv) % self.coeff_modulus
+                          for r in self.roots_of_unity_inv]
+        return np.asarray(scaled_rou_inv, dtype=self._twiddle_dtype)
+
+    @cached_property
+    def stage_twiddles_inv(self):
+        """Builds the per-stage inverse butterfly twiddles on first use, as
+        strided views into the contiguous d/2 inverse omega powers."""
+        omega_powers_inv = np.ascontiguousarray(self.roots_of_unity_inv[0::2])
+        log_degree = self.degree.bit_length() - 1
+        return [omega_powers_inv[::1 << (log_degree - logm)]
+                for logm in range(1, log_degree + 1)]
+
+    @cached_property
+    def stage_twiddles_inv_precon(self):
+        """Builds the per-stage Shoup preconditioned inverse twiddles on first
+        use, or None when the modulus does not permit them."""
+        if self._twiddle_dtype is not object or self.coeff_modulus >= (1 << 62):
+            return None
+        omega_powers_inv = np.ascontiguousarray(self.roots_of_unity_inv[0::2])
+        omega_precon_inv = \
+            (omega_powers_inv * (1 << 64)) // self.coeff_modulus
+        log_degree = self.degree.bit_length() - 1
+        return [omega_precon_inv[::1 << (log_degree - logm)]
+                for logm in range(1, log_degree + 1)]
+
+    @cached_property
+    def _rou_inv_u64(self):
+        """Builds the uint64 inverse butterfly twiddles for the compiled
+        kernel on first use, or None when the kernel does not apply."""
+        if numba is None or self.coeff_modulus >= (1 << 62):
+            return None
+        return np.asarray([int(w) for w in self.roots_of_unity_inv[0::2]],
+                          dtype=np.uint64)
+
+    @cached_property
+    def _rou_inv_precon_u64(self):
+        """Builds the uint64 Shoup preconditioned inverse twiddles for the
+        compiled kernel on first use, or None when the kernel does not
+        apply."""
+        if self._rou_inv_u64 is None:
+            return None
+        q = self.coeff_modulus
+        return np.asarray([(int(w) << 64) // q for w in self._rou_inv_u64],
+                          dtype=np.uint64)
+
+    def _bit_reverse(self, values):
+        """Applies the bit-reversal permutation along the last axis.
+
+        Uses the precomputed reversed_bits indices, so the permutation is a
+        single fancy-index gather returning a new array.
 
-        # Compute precomputed array of reversed bits for iterated NTT.
-        self.reversed_bits = [0] * self.degree
-        width = int(log(self.degree, 2))
-        for i in range(self.degree):
-            self.reversed_bits[i] = reverse_bits(i, width) % self.degree
+        Args:
+            values (ndarray): Array whose last axis has length equal to the
+                polynomial degree.
 
-    def ntt(self, coeffs, rou):
+        Returns:
+            The array with its last axis permuted into bit-reversed order.
+        """
+        return np.asarray(values)[..., self.reversed_bits]
+
+    def ntt(self, coeffs, rou, stage_rou=None, stage_rou_precon=None):
         """Runs NTT on the given coefficients.
 
         Runs iterated NTT with the given coefficients and roots of unity. See
@@ -90,34 +422,163 @@ class NTTContext:
                 length of the polynomial degree.
             rou (list): Powers of roots of unity to be used for transformation.
                 For inverse NTT, this is the powers of the inverse root of unity.
+            stage_rou (list): Contiguous per-stage twiddle tables matching rou,
+                where the (logm - 1)th entry holds the twiddles for stage logm.
+                If None, the stage twiddles are sliced out of rou instead.
+            stage_rou_precon (list): Per-stage tables of Shoup preconditioned
+                twiddles, floor(w * 2^64 / q), matching stage_rou. If None,
+                butterflies reduce with a plain modulo.
 
         Returns:
             List of transformed coefficients.
         """
         num_coeffs = len(coeffs)
         assert len(rou) == num_coeffs, \
-            "Length of the roots of unity is too small. Length is " + len(rou)
-
-        result = bit_reverse_vec(coeffs)
+            "Length of the roots of unity is too small. Length is " + str(len(rou))
 
-        log_num_coeffs = int(log(num_coeffs, 2))
+        # Reduce inputs with arbitrary precision first, since callers may pass
+        # unreduced (or negative) coefficients.
+        result = self._bit_reverse(np.asarray(coeffs, dtype=object)) \
+            % self.coeff_modulus
 
-        for logm in range(1, log_num_coeffs + 1):
-            for j in range(0, num_coeffs, (1 << logm)):
-                for i in range(1 << (logm - 1)):
-                    index_even = j + i
-                    index_odd = j + i + (1 << (logm - 1))
+        return self._ntt_stages(result, rou, stage_rou, stage_rou_precon)
 
-                    rou_idx = (i << (1 + log_num_coeffs - logm))
-                    omega_factor = (rou[rou_idx] * result[index_odd]) % self.coeff_modulus
+    def _ntt_stages(self, result, rou, stage_rou=None, stage_rou_precon=None):
+        """Runs the NTT butterfly stages on bit-reversed coefficients.
 
-                    butterfly_plus = (result[index_even] + omega_factor) % self.coeff_modulus
-                    butterfly_minus = (result[index_even] - omega_factor) % self.coeff_modulus
+        Shared back half of ntt: callers that fuse extra work into the
+        initial bit-reversal gather (such as ftt_fwd's pre-scale) enter here
+        directly with an already permuted, reduced coefficient array.
 
-                    result[index_even] = butterfly_plus
-                    result[index_odd] = butterfly_minus
+        Args:
+            result (ndarray): Bit-reversed coefficients, reduced mod the
+                coefficient modulus, in object or uint64 dtype.
+            rou (list): Powers of roots of unity to be used for transformation.
+            stage_rou (list): Contiguous per-stage twiddle tables matching rou.
+            stage_rou_precon (list): Per-stage Shoup preconditioned twiddles
+                matching stage_rou, or None.
 
-        return result
+        Returns:
+            List of transformed coefficients.
+        """
+        q = self.coeff_modulus
+        num_coeffs = len(result)
+        rou = np.asarray(rou)
+
+        if rou.dtype == np.uint64 and result.dtype == object:
+            result = result.astype(np.uint64)
+
+        log_num_coeffs = num_coeffs.bit_length() - 1
+
+        # When the twiddles passed in are the context's own tables and the
+        # modulus admits the Harvey butterfly, hand the whole transform to the
+        # compiled kernel.
+        if self._rou_u64 is not None:
+            if rou is self.roots_of_unity:
+                return _ntt_u64(result.astype(np.uint64, copy=False),
+                                self._rou_u64, self._rou_precon_u64,
+                                np.uint64(q), log_num_coeffs).tolist()
+            # The membership test keeps the lazy inverse tables unbuilt when a
+            # caller passes custom twiddles to a forward-only context.
+            if "roots_of_unity_inv" in self.__dict__ \
+                    and rou is self.roots_of_unity_inv:
+                return _ntt_u64(result.astype(np.uint64, copy=False),
+                                self._rou_inv_u64, self._rou_inv_precon_u64,
+                                np.uint64(q), log_num_coeffs).tolist()
+
+        def stage_twiddles_at(logm):
+            """Returns the (twiddles, preconditioned twiddles) of stage logm."""
+            if stage_rou is not None:
+                twiddles = stage_rou[logm - 1]
+                precon = stage_rou_precon[logm - 1] \
+                    if stage_rou_precon is not None else None
+            else:
+                step = 1 << (1 + log_num_coeffs - logm)
+                twiddles = rou[0:(1 << (logm - 1)) * step:step]
+                precon = None
+            return twiddles, precon
+
+        def mul_twiddle(twiddles, precon, values):
+            """Multiplies values by twiddles mod q, via the Harvey butterfly
+            when preconditioned twiddles are available."""
+            if precon is not None:
+                # Two multiplies and a shift replace the big-int modulo,
+                # followed by one conditional subtract.
+                quotient = (precon * values) >> 64
+                product = twiddles * values - quotient * q
+                return np.where(product >= q, product - q, product)
+            return (twiddles * values) % q
+
+        def add_mod(x, y):
+            """Adds two reduced arrays mod q with a conditional subtract,
+            avoiding the division path of a true modulo."""
+            total = x + y
+            return np.where(total >= q, total - q, total)
+
+        def sub_mod(x, y):
+            """Subtracts reduced array y from x mod q with a conditional
+            subtract, avoiding the division path of a true modulo."""
+            diff = x + (q - y)
+            return np.where(diff >= q, diff - q, diff)
+
+        # Each stage performs all of its butterflies at once: the coefficients
+        # are viewed as blocks of length m, whose lower halves hold the even
+        # indices and upper halves the odd indices of the original loop. Two
+        # consecutive stages are merged into one radix-4 pass over the data,
+        # keeping the intermediate butterfly outputs in temporaries instead of
+        # writing them back between stages; a lone radix-2 stage remains at
+        # the end when the number of stages is odd.
+        logm = 1
+        while logm < log_num_coeffs:
+            half = 1 << (logm - 1)
+            twiddles_1, precon_1 = stage_twiddles_at(logm)
+            twiddles_2, precon_2 = stage_twiddles_at(logm + 1)
+
+            blocks = result.reshape(-1, 4 * half)
+            quarter_a = blocks[:, :half]
+            quarter_b = blocks[:, half:2 * half]
+            quarter_c = blocks[:, 2 * half:3 * half]
+            quarter_d = blocks[:, 3 * half:]
+
+            # First stage: butterflies on (a, b) and (c, d).
+            omega_b = mul_twiddle(twiddles_1, precon_1, quarter_b)
+            omega_d = mul_twiddle(twiddles_1, precon_1, quarter_d)
+            a_1 = add_mod(quarter_a, omega_b)
+            b_1 = sub_mod(quarter_a, omega_b)
+            c_1 = add_mod(quarter_c, omega_d)
+            d_1 = sub_mod(quarter_c, omega_d)
+
+            # Second stage: butterflies on (a, c) and (b, d), using the lower
+            # and upper halves of the next stage's twiddles.
+            omega_c = mul_twiddle(twiddles_2[:half],
+                                  precon_2[:half] if precon_2 is not None else None,
+                                  c_1)
+            omega_d = mul_twiddle(twiddles_2[half:],
+                                  precon_2[half:] if precon_2 is not None else None,
+                                  d_1)
+            blocks[:, :half] = add_mod(a_1, omega_c)
+            blocks[:, half:2 * half] = add_mod(b_1, omega_d)
+            blocks[:, 2 * half:3 * half] = sub_mod(a_1, omega_c)
+            blocks[:, 3 * half:] = sub_mod(b_1, omega_d)
+
+            logm += 2
+
+        if logm == log_num_coeffs:
+            half = 1 << (logm - 1)
+            twiddles, precon = stage_twiddles_at(logm)
+
+            blocks = result.reshape(-1, 2 * half)
+            even = blocks[:, :half]
+            odd = blocks[:, half:]
+
+            omega_factor = mul_twiddle(twiddles, precon, odd)
+            butterfly_plus = add_mod(even, omega_factor)
+            butterfly_minus = sub_mod(even, omega_factor)
+
+            blocks[:, :half] = butterfly_plus
+            blocks[:, half:] = butterfly_minus
+
+        return result.tolist()
 
     def ftt_fwd(self, coeffs):
         """Runs forward FTT on the given coefficients.
@@ -134,11 +595,22 @@ class NTTContext:
         num_coeffs = len(coeffs)
         assert num_coeffs == self.degree, "ftt_fwd: input length does not match context degree"
 
-        # We use the FTT input given in the FTT paper.
-        ftt_input = [(int(coeffs[i]) * self.roots_of_unity[i]) % self.coeff_modulus
-                     for i in range(num_coeffs)]
-
-        return self.ntt(coeffs=ftt_input, rou=self.roots_of_unity)
+        # We use the FTT input given in the FTT paper. The pre-scale is fused
+        # into the bit-reversal gather: permuting first and multiplying by the
+        # bit-reversed twiddles is the same as scaling and then permuting, and
+        # saves a full pass over the coefficients. The inputs are reduced with
+        # arbitrary precision first, since callers may pass unreduced (or
+        # negative) coefficients.
+        ftt_input = self._bit_reverse(np.asarray(coeffs, dtype=object)) \
+            % self.coeff_modulus
+        scale = self._rou_reversed
+        if scale.dtype == np.uint64:
+            ftt_input = ftt_input.astype(np.uint64)
+        ftt_input = (ftt_input * scale) % self.coeff_modulus
+
+        return self._ntt_stages(ftt_input, rou=self.roots_of_unity,
+                                stage_rou=self.stage_twiddles,
+                                stage_rou_precon=self.stage_twiddles_precon)
 
     def ftt_inv(self, coeffs):
         """Runs inverse FTT on the given coefficients.
@@ -155,14 +627,89 @@ class NTTContext:
         num_coeffs = len(coeffs)
         assert num_coeffs == self.degree, "ntt_inv: input length does not match context degree"
 
-        to_scale_down = self.ntt(coeffs=coeffs, rou=self.roots_of_unity_inv)
-        poly_degree_inv = nbtheory.mod_inv(self.degree, self.coeff_modulus)
+        to_scale_down = self.ntt(coeffs=coeffs, rou=self.roots_of_unity_inv,
+                                 stage_rou=self.stage_twiddles_inv,
+                                 stage_rou_precon=self.stage_twiddles_inv_precon)
 
         # We scale down the FTT output given in the FTT paper.
-        result = [(int(to_scale_down[i]) * self.roots_of_unity_inv[i] * poly_degree_inv) \
-                  % self.coeff_modulus for i in range(num_coeffs)]
+        to_scale_down = np.asarray(to_scale_down, dtype=object)
+        if self.scaled_rou_inv.dtype == np.uint64:
+            to_scale_down = to_scale_down.astype(np.uint64)
+        result = (to_scale_down * self.scaled_rou_inv) % self.coeff_modulus
 
-        return result
+        return result.tolist()
+
+    def _cuda_twiddles(self, inverse):
+        """Returns device (twiddle, preconditioned twiddle) arrays.
+
+        Builds the uint64 butterfly twiddles for the requested direction on
+        the GPU on first use and caches them on the context.
+
+        Args:
+            inverse (bool): Whether to return the inverse-NTT twiddles.
+
+        Returns:
+            A tuple of two cupy uint64 arrays: the d/2 distinct butterfly
+            twiddles and their Shoup preconditioned forms.
+        """
+        if inverse not in self._cuda_twiddle_cache:
+            q = self.coeff_modulus
+            source = self.roots_of_unity_inv if inverse else self.roots_of_unity
+            omega = [int(w) for w in source[0::2]]
+            omega_precon = [(w << 64) // q for w in omega]
+            self._cuda_twiddle_cache[inverse] = (
+                cupy.asarray(np.asarray(omega, dtype=np.uint64)),
+                cupy.asarray(np.asarray(omega_precon, dtype=np.uint64)))
+        return self._cuda_twiddle_cache[inverse]
+
+    def ntt_batched_cuda(self, coeffs_batch, inverse=False):
+        """Runs the NTT on a batch of polynomials on the GPU.
+
+        Runs the same forward or inverse NTT over every row of the batch with
+        CuPy, one CUDA thread per butterfly, looping over stages on the host.
+        Batching amortizes the kernel-launch overhead, so this pays off when
+        many polynomials under the same modulus are transformed together
+        (e.g. across an RNS dimension). Like ntt, the inverse direction does
+        not apply the 1/d scaling; ftt-style callers scale afterwards.
+
+        Requires the optional cupy dependency and a modulus below 2^62.
+
+        Args:
+            coeffs_batch (list): 2-D array-like of shape (batch, degree)
+                holding the coefficient rows to transform.
+            inverse (bool): Runs the inverse NTT when True.
+
+        Returns:
+            A 2-D uint64 ndarray (on the host) of transformed rows.
+        """
+        if cupy is None:
+            raise ImportError("ntt_batched_cuda requires the optional cupy "
+                              "dependency.")
+        assert self.coeff_modulus < (1 << 62), \
+            "ntt_batched_cuda requires a modulus below 2^62."
+
+        batch = np.asarray(coeffs_batch, dtype=object) % self.coeff_modulus
+        assert batch.ndim == 2 and batch.shape[1] == self.degree, \
+            "ntt_batched_cuda: rows must match the context degree"
+
+        data = cupy.asarray(self._bit_reverse(batch).astype(np.uint64))
+        rou_dev, rou_precon_dev = self._cuda_twiddles(inverse)
+
+        num_rows = batch.shape[0]
+        log_num_coeffs = self.degree.bit_length() - 1
+        num_butterflies = num_rows * (self.degree >> 1)
+
+        kernel = cupy.RawKernel(_NTT_STAGE_CUDA_SRC, "ntt_stage")
+        threads_per_block = 256
+        num_blocks = (num_butterflies + threads_per_block - 1) // threads_per_block
+        for logm in range(1, log_num_coeffs + 1):
+            kernel((num_blocks,), (threads_per_block,),
+                   (data, rou_dev, rou_precon_dev,
+                    np.uint64(self.coeff_modulus),
+                    np.int64(num_butterflies), np.int32(logm),
+                    np.int32(log_num_coeffs)))
+
+        return cupy.asnumpy(data)
 
 
 class FFTContext:
@@ -173,12 +720,18 @@ class FFTContext:
 
     Attributes:
         fft_length (int): Length of the FFT vector. This must be twice the polynomial degree.
-        roots_of_unity (list): The ith member of the list is w^i, where w
+        roots_of_unity (ndarray): The ith member of the array is w^i, where w
             is a root of unity.
         rot_group (list): Used for EMB only. Value at index i is 5i (mod fft_length)
             for 0 <= i < fft_length / 4.
-        reversed_bits (list): The ith member of the list is the bits of i
-            reversed, used in the iterative implementation of FFT.
+        emb_twiddles (list): The (logm - 1)th member of the list is an array of
+            the rotation-group twiddles consumed by stage logm of the
+            embedding.
+        emb_twiddles_inv (list): Same as emb_twiddles, for the inverse
+            embedding.
+        reversed_bits (ndarray): The ith member of the np.intp array is the
+            bits of i reversed, used as a fancy-index gather in the iterative
+            implementation of FFT.
     """
     def __init__(self, fft_length):
         """Inits FFTContext with a length for the FFT vector.
@@ -195,25 +748,64 @@ class FFTContext:
         Precomputes all powers of roots of unity for the FFT and powers of inverse
         roots of unity for the inverse FFT.
         """
-        self.roots_of_unity = [0] * self.fft_length
-        self.roots_of_unity_inv = [0] * self.fft_length
-        for i in range(self.fft_length):
-            angle = 2 * pi * i / self.fft_length
-            self.roots_of_unity[i] = complex(cos(angle), sin(angle))
-            self.roots_of_unity_inv[i] = complex(cos(-angle), sin(-angle))
-
-        # Compute precomputed array of reversed bits for iterated FFT.
+        # Native complex doubles instead of a list of PyObject complex values,
+        # so the butterflies can run as whole-array operations.
+        angles = 2 * np.pi * np.arange(self.fft_length) / self.fft_length
+        self.roots_of_unity = np.exp(1j * angles)
+        self.roots_of_unity_inv = np.exp(-1j * angles)
+
+        # Compute precomputed array of reversed bits for iterated FFT. The
+        # array is kept as np.intp so the bit-reversal permutation is a single
+        # fancy-index gather.
         num_slots = self.fft_length // 4
-        self.reversed_bits = [0] * num_slots
-        width = int(log(num_slots, 2))
-        for i in range(num_slots):
-            self.reversed_bits[i] = reverse_bits(i, width) % num_slots
+        width = num_slots.bit_length() - 1
+        indices = np.arange(num_slots, dtype=np.uint32)
+        reversed_bits = np.zeros_like(indices)
+        for bit in range(width):
+            reversed_bits |= ((indices >> bit) & 1) << (width - 1 - bit)
+        self.reversed_bits = reversed_bits.astype(np.intp)
 
         # Compute rotation group for EMB with powers of 5.
         self.rot_group = [1] * num_slots
         for i in range(1, num_slots):
             self.rot_group[i] = (5 * self.rot_group[i - 1]) % self.fft_length
 
+        # Per-stage embedding twiddles, gathered once so the embedding
+        # butterflies run as whole-array operations. The twiddle indices
+        # (rot_group[i] % 4m) * (M / 4m) depend only on the stage, not on the
+        # input length, so one table per stage serves all embedding sizes.
+        # Reducing the rotation group per stage here removes the % and the
+        # multiply from the transforms entirely.
+        rot_group = np.asarray(self.rot_group, dtype=np.intp)
+        self.emb_twiddles = []
+        self.emb_twiddles_inv = []
+        for logm in range(1, width + 1):
+            idx_mod = 1 << (logm + 2)
+            gap = self.fft_length // idx_mod
+            indices = (rot_group[:1 << (logm - 1)] % idx_mod) * gap
+            self.emb_twiddles.append(self.roots_of_unity[indices])
+            self.emb_twiddles_inv.append(self.roots_of_unity_inv[indices])
+
+    def _bit_reverse(self, values):
+        """Applies the bit-reversal permutation to a complex vector.
+
+        When the input length matches the precomputed reversed_bits indices,
+        the permutation is a single fancy-index gather; shorter power-of-two
+        inputs (the embeddings accept any length up to fft_length / 4) fall
+        back to bit_reverse_vec.
+
+        Args:
+            values (list): Complex vector whose length is a power of two.
+
+        Returns:
+            A complex128 array of the values in bit-reversed order.
+        """
+        values = np.asarray(values, dtype=np.complex128)
+        if len(values) == len(self.reversed_bits):
+            return values[self.reversed_bits]
+        return np.asarray(bit_reverse_vec(values.tolist()),
+                          dtype=np.complex128)
+
     def fft(self, coeffs, rou):
         """Runs FFT on the given coefficients.
 
@@ -233,26 +825,33 @@ class FFTContext:
         assert len(rou) >= num_coeffs, \
             "Length of the roots of unity is too small. Length is " + str(len(rou))
 
-        result = bit_reverse_vec(coeffs)
+        rou = np.asarray(rou)
+        result = self._bit_reverse(coeffs)
 
-        log_num_coeffs = int(log(num_coeffs, 2))
+        log_num_coeffs = num_coeffs.bit_length() - 1
 
+        # Each stage performs all of its butterflies at once: the coefficients
+        # are viewed as blocks of length m, whose lower halves hold the even
+        # indices and upper halves the odd indices of the original loop.
         for logm in range(1, log_num_coeffs + 1):
-            for j in range(0, num_coeffs, (1 << logm)):
-                for i in range(1 << (logm - 1)):
-                    index_even = j + i
-                    index_odd = j + i + (1 << (logm - 1))
+            m = 1 << logm
+            half = m >> 1
+            step = self.fft_length >> logm
+            twiddles = rou[0:half * step:step]
 
-                    rou_idx = (i * self.fft_length) >> logm
-                    omega_factor = rou[rou_idx] * result[index_odd]
+            blocks = result.reshape(-1, m)
+            even = blocks[:, :half]
+            odd = blocks[:, half:]
 
-                    butterfly_plus = result[index_even] + omega_factor
-                    butterfly_minus = result[index_even] - omega_factor
+            omega_factor = twiddles * odd
 
-                    result[index_even] = butterfly_plus
-                    result[index_odd] = butterfly_minus
+            butterfly_plus = even + omega_factor
+            butterfly_minus = even - omega_factor
 
-        return result
+            blocks[:, :half] = butterfly_plus
+            blocks[:, half:] = butterfly_minus
+
+        return result.tolist()
 
     def fft_fwd(self, coeffs):
         """Runs forward FFT on the given values.
@@ -265,7 +864,11 @@ class FFTContext:
         Returns:
             List of transformed coefficients.
         """
-        return self.fft(coeffs, rou=self.roots_of_unity)
+        # This FFT uses the positive-exponent convention e^(2*pi*i/M), the
+        # conjugate of NumPy's, so the forward transform here is NumPy's
+        # inverse transform without its 1/n scaling.
+        num_coeffs = len(coeffs)
+        return (np.fft.ifft(np.asarray(coeffs)) * num_coeffs).tolist()
 
     def fft_inv(self, coeffs):
         """Runs inverse FFT on the given values.
@@ -279,12 +882,7 @@ class FFTContext:
             List of transformed coefficients.
         """
         num_coeffs = len(coeffs)
-        result = self.fft(coeffs, rou=self.roots_of_unity_inv)
-
-        for i in range(num_coeffs):
-            result[i] /= num_coeffs
-
-        return result
+        return (np.fft.fft(np.asarray(coeffs)) / num_coeffs).tolist()
 
     def check_embedding_input(self, values):
         """Checks that the length of the input vector to embedding is the correct size.
@@ -313,27 +911,28 @@ class FFTContext:
         """
         self.check_embedding_input(coeffs)
         num_coeffs = len(coeffs)
-        result = bit_reverse_vec(coeffs)
-        log_num_coeffs = int(log(num_coeffs, 2))
+        result = self._bit_reverse(coeffs)
+        log_num_coeffs = num_coeffs.bit_length() - 1
 
+        # Each stage performs all of its butterflies at once, with the
+        # rotation-group twiddles for the stage precomputed in emb_twiddles.
         for logm in range(1, log_num_coeffs + 1):
-            idx_mod = 1 << (logm + 2)
-            gap = self.fft_length // idx_mod
-            for j in range(0, num_coeffs, (1 << logm)):
-                for i in range(1 << (logm - 1)):
-                    index_even = j + i
-                    index_odd = j + i + (1 << (logm - 1))
+            half = 1 << (logm - 1)
+            twiddles = self.emb_twiddles[logm - 1]
 
-                    rou_idx = (self.rot_group[i] % idx_mod) * gap
-                    omega_factor = self.roots_of_unity[rou_idx] * result[index_odd]
+            blocks = result.reshape(-1, 2 * half)
+            even = blocks[:, :half]
+            odd = blocks[:, half:]
 
-                    butterfly_plus = result[index_even] + omega_factor
-                    butterfly_minus = result[index_even] - omega_factor
+            omega_factor = twiddles * odd
 
-                    result[index_even] = butterfly_plus
-                    result[index_odd] = butterfly_minus
+            butterfly_plus = even + omega_factor
+            butterfly_minus = even - omega_factor
 
-        return result
+            blocks[:, :half] = butterfly_plus
+            blocks[:, half:] = butterfly_minus
+
+        return result.tolist()
 
     def embedding_inv(self, coeffs):
         """Computes the inverse variant of the canonical embedding.
@@ -346,29 +945,65 @@ class FFTContext:
         """
         self.check_embedding_input(coeffs)
         num_coeffs = len(coeffs)
-        result = coeffs.copy()
-        log_num_coeffs = int(log(num_coeffs, 2))
+        result = np.array(coeffs, dtype=np.complex128)
+        log_num_coeffs = num_coeffs.bit_length() - 1
 
+        # Each stage performs all of its butterflies at once, with the
+        # rotation-group twiddles for the stage precomputed in
+        # emb_twiddles_inv.
         for logm in range(log_num_coeffs, 0, -1):
-            idx_mod = 1 << (logm + 2)
-            gap = self.fft_length // idx_mod
-            for j in range(0, num_coeffs, 1 << logm):
-                for i in range(1 << (logm - 1)):
-                    index_even = j + i
-                    index_odd = j + i + (1 << (logm - 1))
+            half = 1 << (logm - 1)
+            twiddles = self.emb_twiddles_inv[logm - 1]
+
+            blocks = result.reshape(-1, 2 * half)
+            even = blocks[:, :half]
+            odd = blocks[:, half:]
+
+            butterfly_plus = even + odd
+            butterfly_minus = (even - odd) * twiddles
+
+            blocks[:, :half] = butterfly_plus
+            blocks[:, half:] = butterfly_minus
 
-                    rou_idx = (self.rot_group[i] % idx_mod) * gap
+        to_scale_down = self._bit_reverse(result)
 
-                    butterfly_plus = result[index_even] + result[index_odd]
-                    butterfly_minus = result[index_even] - result[index_odd]
-                    butterfly_minus *= self.roots_of_unity_inv[rou_idx]
+        return (to_scale_down / num_coeffs).tolist()
 
-                    result[index_even] = butterfly_plus
-                    result[index_odd] = butterfly_minus
 
-        to_scale_down = bit_reverse_vec(result)
+@lru_cache(maxsize=64)
+def get_ntt_context(poly_degree, coeff_modulus, root_of_unity=None):
+    """Returns a cached NTTContext for the given parameters.
 
-        for i in range(num_coeffs):
-            to_scale_down[i] /= num_coeffs
+    Constructing an NTTContext performs O(d) precomputations, so callers that
+    repeatedly need a context for the same ring (e.g. one per RNS prime for
+    every operation) should use this factory instead of the constructor: it
+    returns the same instance for equal parameters. Contexts are immutable
+    after construction, so sharing them is safe.
 
-        return to_scale_down
+    Args:
+        poly_degree (int): Degree of the polynomial ring.
+        coeff_modulus (int): Modulus for coefficients of the polynomial.
+        root_of_unity (int): Root of unity to perform the NTT with. If it
+            takes its default value of None, we compute a root of unity to
+            use.
+
+    Returns:
+        A shared NTTContext instance for the given parameters.
+    """
+    return NTTContext(poly_degree, coeff_modulus, root_of_unity)
+
+
+@lru_cache(maxsize=64)
+def get_fft_context(fft_length):
+    """Returns a cached FFTContext for the given FFT length.
+
+    See get_ntt_context; the same reasoning applies to the FFT
+    precomputations.
+
+    Args:
+        fft_length (int): Length of the FFT vector.
+
+    Returns:
+        A shared FFTContext instance for the given length.
+    """
+    return FFTContext(fft_length)
@@ -1,7 +1,7 @@
 """A module to handle polynomial arithmetic in the quotient ring
 Z_a[x]/f(x).
 """
-from util.ntt import NTTContext, FFTContext
+from util.ntt import get_fft_context
 
 class Polynomial:
     """A polynomial in the ring R_a.
@@ -160,7 +160,7 @@ class Polynomial:
         """
         assert isinstance(poly, Polynomial)
 
-        fft = FFTContext(self.ring_degree * 8)
+        fft = get_fft_context(self.ring_degree * 8)
         a = fft.fft_fwd(self.coeffs + [0] * self.ring_degree)
         b = fft.fft_fwd(poly.coeffs + [0] * self.ring_degree)
         ab = [a[i] * b[i] for i in range(self.ring_degree * 2)]